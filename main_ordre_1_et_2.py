@@ -13,13 +13,140 @@ Utilisation:
 Dépendances externes:
     - numpy
     - midiutil
+    - numba (optionnel, compile les boucles de génération)
 """
 
 # Import des bibliothèques nécessaires
-import random
+import functools
+import io
+from pathlib import Path
+from types import MappingProxyType
+
 import numpy as np
 from midiutil import MIDIFile
 
+from noyaux_markov import (
+    AVEC_NUMBA,
+    SEUIL_LOT_NUMPY,
+    simuler_lot,
+    simuler_lot_numpy,
+    simuler_ordre2,
+    simuler_ordre2_creux,
+    table_alias,
+    tables_alias,
+)
+
+# Conversion des noms de notes en valeurs MIDI
+NOTE_TO_MIDI = MappingProxyType(
+    {
+        "C": 60,
+        "C#": 61,
+        "Db": 61,
+        "D": 62,
+        "D#": 63,
+        "Eb": 63,
+        "E": 64,
+        "F": 65,
+        "F#": 66,
+        "Gb": 66,
+        "G": 67,
+        "G#": 68,
+        "Ab": 68,
+        "A": 69,
+        "A#": 70,
+        "Bb": 70,
+        "B": 71,
+    }
+)
+
+# Alphabet des notes connues : chaque note a un indice compact, et IDX_TO_MIDI
+# donne directement la valeur MIDI d'un indice
+NOTES = tuple(NOTE_TO_MIDI)
+NOTE_TO_IDX = {note: i for i, note in enumerate(NOTES)}
+IDX_TO_MIDI = np.array([NOTE_TO_MIDI[note] for note in NOTES], dtype=np.int8)
+_TABLE_NOTES = np.array(NOTES)
+
+
+def encoder_notes(notes, ignorer_inconnues=False):
+    """
+    Code une séquence de noms de notes par leurs indices dans NOTES.
+
+    Les notes circulent ensuite sous forme de tableau int8 dans les calculs,
+    et ne sont reconverties en noms (decoder_notes) ou en valeurs MIDI
+    (IDX_TO_MIDI) qu'en sortie. Une séquence déjà codée est renvoyée telle
+    quelle, après vérification que ses indices désignent bien des notes.
+
+    Args:
+        notes (list ou np.ndarray): Des noms de notes (ex: ["C", "D", "E", ...])
+                                    ou des indices de notes
+        ignorer_inconnues (bool, optional): Coder une note inconnue par -1 au
+                                            lieu de lever une erreur (un indice
+                                            -1 est alors aussi accepté)
+
+    Returns:
+        np.ndarray: Les indices des notes (int8)
+
+    Raises:
+        ValueError: Si une note ne fait pas partie de NOTES, ou si un indice
+                    est en dehors de NOTES
+    """
+    if isinstance(notes, np.ndarray) and notes.dtype.kind in "iu":
+        # Un indice hors de NOTES ferait un tour complet dans int8, et -1
+        # désignerait silencieusement la dernière note
+        minimum = -1 if ignorer_inconnues else 0
+        invalides = (notes < minimum) | (notes >= len(NOTES))
+        if invalides.any():
+            raise ValueError(f"Note inconnue : {notes[invalides][0].item()!r}")
+        return notes.astype(np.int8, copy=False)
+
+    if ignorer_inconnues:
+        indices = (NOTE_TO_IDX.get(note, -1) for note in notes)
+    else:
+        try:
+            indices = [NOTE_TO_IDX[note] for note in notes]
+        except KeyError as erreur:
+            raise ValueError(f"Note inconnue : {erreur.args[0]!r}") from None
+    return np.fromiter(indices, dtype=np.int8, count=len(notes))
+
+
+def decoder_notes(indices):
+    """
+    Reconvertit des indices de notes (voir encoder_notes) en noms de notes.
+
+    Args:
+        indices (np.ndarray): Des indices de notes
+
+    Returns:
+        list: Les noms des notes correspondantes
+    """
+    return _TABLE_NOTES[indices].tolist()
+
+
+def _encoder_sequence(sequence):
+    """
+    Code une séquence de notes pour la construction des matrices.
+
+    Returns:
+        tuple: Un triplet (note_vers_indice, indice_vers_note, indices) où
+               note_vers_indice est NOTE_TO_IDX, indice_vers_note le tableau
+               numpy des noms de NOTES et indices la séquence codée, d'un type
+               entier assez large pour calculer les indices d'états
+    """
+    indices = encoder_notes(sequence).astype(np.intp)
+    return NOTE_TO_IDX, _TABLE_NOTES, indices
+
+
+def _normaliser_lignes(comptes):
+    """
+    Convertit une matrice de comptes en matrice stochastique par lignes.
+
+    Les lignes sans aucune transition observée restent nulles. La division
+    se fait sur place : le tableau de comptes devient la matrice.
+    """
+    totaux = comptes.sum(axis=1, keepdims=True)
+    totaux[totaux == 0] = 1
+    return np.divide(comptes, totaux, out=comptes)
+
 
 def construire_matrice_transition(sequence):
     """
@@ -27,42 +154,27 @@ def construire_matrice_transition(sequence):
 
     La matrice de transition contient les probabilités de passer d'une note
     à une autre, calculées à partir de la fréquence de ces transitions dans
-    la séquence d'entrée.
+    la séquence d'entrée. La séquence est codée une seule fois en indices,
+    puis toutes les transitions sont comptées en une passe vectorisée.
 
     Args:
-        sequence (list): Une liste de notes musicales (ex: ["C", "D", "E", ...])
+        sequence (list): Une liste de notes musicales (ex: ["C", "D", "E", ...]),
+                         ou la même séquence codée par encoder_notes
 
     Returns:
-        dict: Un dictionnaire de dictionnaires représentant la matrice de transition.
-              Le format est {note_actuelle: {note_suivante: probabilité, ...}, ...}
+        tuple: Un triplet (note_vers_indice, indice_vers_note, P) où P est une
+               matrice numpy (m, m), avec m = len(NOTES), telle que P[i, j] est
+               la probabilité de passer de la note i à la note j. La ligne
+               d'une note sans successeur observé est nulle.
     """
-    # Dictionnaire pour stocker les transitions
-    transitions = {}
-
-    # Compter les transitions
-    for i in range(len(sequence) - 1):
-        note_actuelle = sequence[i]
-        note_suivante = sequence[i + 1]
-
-        # Si la note actuelle n'est pas encore dans le dictionnaire, l'initialiser
-        if note_actuelle not in transitions:
-            transitions[note_actuelle] = {}
-
-        # Incrémenter le compteur pour cette transition
-        if note_suivante in transitions[note_actuelle]:
-            transitions[note_actuelle][note_suivante] += 1
-        else:
-            transitions[note_actuelle][note_suivante] = 1
+    note_vers_indice, indice_vers_note, indices = _encoder_sequence(sequence)
+    m = len(indice_vers_note)
 
-    # Convertir les compteurs en probabilités
-    matrice_proba = {}
-    for note_actuelle, suivantes in transitions.items():
-        total = sum(suivantes.values())
-        matrice_proba[note_actuelle] = {
-            note_suivante: count / total for note_suivante, count in suivantes.items()
-        }
+    # Compter les transitions (i -> j) en une seule passe
+    comptes = np.zeros((m, m), dtype=np.float64)
+    np.add.at(comptes, (indices[:-1], indices[1:]), 1)
 
-    return matrice_proba
+    return note_vers_indice, indice_vers_note, _normaliser_lignes(comptes)
 
 
 def construire_matrice_transition_ordre2(sequence):
@@ -71,40 +183,139 @@ def construire_matrice_transition_ordre2(sequence):
 
     Dans une chaîne de Markov d'ordre 2, l'état est défini par les deux notes
     précédentes, ce qui permet de capturer des motifs musicaux plus complexes.
+    La paire de notes (a, b) est représentée par l'indice de ligne a * m + b.
+
+    Args:
+        sequence (list): Une liste de notes musicales (ex: ["C", "D", "E", ...]),
+                         ou la même séquence codée par encoder_notes
+
+    Returns:
+        tuple: Un triplet (note_vers_indice, indice_vers_note, P) où P est une
+               matrice numpy (m * m, m) telle que P[a * m + b, j] est la
+               probabilité de jouer la note j après la paire (a, b). Les lignes
+               des paires jamais observées sont nulles.
+    """
+    note_vers_indice, indice_vers_note, indices = _encoder_sequence(sequence)
+    m = len(indice_vers_note)
+
+    # Indice de ligne de chaque paire de notes consécutives
+    paires = indices[:-2] * m + indices[1:-1]
+
+    comptes = np.zeros((m * m, m), dtype=np.float64)
+    np.add.at(comptes, (paires, indices[2:]), 1)
+
+    return note_vers_indice, indice_vers_note, _normaliser_lignes(comptes)
+
+
+def construire_matrice_transition_ordre2_creuse(sequence):
+    """
+    Construit une matrice de transition d'ordre 2 au format creux (CSR).
+
+    La matrice dense d'ordre 2 a m * m lignes, dont la plupart correspondent à
+    des paires de notes jamais observées. Ce format ne stocke que les
+    transitions observées, triées par ligne :
+    les transitions de la paire (a, b) sont colonnes[debut:fin] avec les
+    probabilités probas[debut:fin], où debut, fin = indptr[r], indptr[r + 1]
+    et r = a * m + b.
 
     Args:
-        sequence (list): Une liste de notes musicales (ex: ["C", "D", "E", ...])
+        sequence (list): Une liste de notes musicales (ex: ["C", "D", "E", ...]),
+                         ou la même séquence codée par encoder_notes
 
     Returns:
-        dict: Un dictionnaire où les clés sont des tuples de deux notes (état actuel)
-              et les valeurs sont des dictionnaires {note_suivante: probabilité, ...}
+        tuple: Un triplet (note_vers_indice, indice_vers_note, P) où P est le
+               triplet CSR (indptr, colonnes, probas)
+    """
+    note_vers_indice, indice_vers_note, indices = _encoder_sequence(sequence)
+    m = len(indice_vers_note)
+
+    # Chaque transition (a, b) -> c est codée par l'entier (a * m + b) * m + c ;
+    # np.unique les trie par ligne puis par colonne et les compte
+    paires = indices[:-2] * m + indices[1:-1]
+    transitions, comptes = np.unique(paires * m + indices[2:], return_counts=True)
+    lignes = transitions // m
+    colonnes = (transitions % m).astype(np.int32)
+
+    indptr = np.zeros(m * m + 1, dtype=np.int64)
+    np.cumsum(np.bincount(lignes, minlength=m * m), out=indptr[1:])
+
+    totaux = np.bincount(lignes, weights=comptes, minlength=m * m)
+    probas = comptes / totaux[lignes]
+
+    return note_vers_indice, indice_vers_note, (indptr, colonnes, probas)
+
+
+def _fonctions_repartition(P):
     """
-    transitions = {}
+    Calcule une fois pour toutes la fonction de répartition de chaque ligne de P.
 
-    for i in range(len(sequence) - 2):
-        etat_actuel = (sequence[i], sequence[i + 1])  # Paire de notes
-        note_suivante = sequence[i + 2]
+    Le tirage d'une transition depuis l'état i se ramène alors à chercher la
+    position d'un nombre uniforme dans la ligne i (voir noyaux_markov.rechercher).
+    """
+    return np.cumsum(P, axis=1)
+
+
+def generer_melodies(matrice, note_depart, longueur, nb_melodies=1, rng=None):
+    """
+    Génère plusieurs mélodies indépendantes avec une chaîne de Markov d'ordre 1.
 
-        if etat_actuel not in transitions:
-            transitions[etat_actuel] = {}
+    Tous les nombres aléatoires sont tirés en un seul appel, puis les
+    nb_melodies parcours de la chaîne sont effectués ensemble à partir de la
+    même note de départ. Chaque note est tirée en temps constant grâce aux
+    tables d'alias des lignes de la matrice.
 
-        if note_suivante in transitions[etat_actuel]:
-            transitions[etat_actuel][note_suivante] += 1
-        else:
-            transitions[etat_actuel][note_suivante] = 1
+    Args:
+        matrice (tuple): La matrice de transition d'ordre 1, telle que renvoyée
+                         par construire_matrice_transition
+        note_depart (str): La première note de chaque mélodie
+        longueur (int): Le nombre total de notes de chaque mélodie
+        nb_melodies (int, optional): Le nombre de mélodies à générer
+        rng (optional): Graine ou numpy.random.Generator utilisé pour les tirages
+
+    Returns:
+        np.ndarray: Un tableau int8 (nb_melodies, longueur) d'indices de notes
+                    (voir decoder_notes), une mélodie par ligne
 
-    # Convertir en probabilités
-    matrice_proba = {}
-    for etat, suivantes in transitions.items():
-        total = sum(suivantes.values())
-        matrice_proba[etat] = {
-            note_suivante: count / total for note_suivante, count in suivantes.items()
-        }
+    Raises:
+        ValueError: Si la matrice ne contient aucune transition observée
+    """
+    _, _, P = matrice
+    i0 = encoder_notes([note_depart])[0]
+    rng = np.random.default_rng(rng)
+
+    observes = P.sum(axis=1) > 0
+    if not observes.any():
+        raise ValueError("La matrice de transition ne contient aucune transition")
+
+    probas, alias = tables_alias(P)
+
+    # Une note sans successeur est remplacée par une note observée au hasard
+    proba_repli, alias_repli = table_alias(observes.astype(np.float64))
+
+    # Sans numba, la boucle Python par note ne reste intéressante que pour
+    # quelques mélodies ; au-delà, les chaînes avancent ensemble via NumPy
+    if AVEC_NUMBA or nb_melodies < SEUIL_LOT_NUMPY:
+        simuler = simuler_lot
+    else:
+        simuler = simuler_lot_numpy
+
+    sorties = simuler(
+        probas,
+        alias,
+        observes,
+        proba_repli,
+        alias_repli,
+        i0,
+        rng.random((nb_melodies, max(longueur - 1, 0))),
+    )
 
-    return matrice_proba
+    melodies = np.empty((nb_melodies, 1 + sorties.shape[1]), dtype=np.int8)
+    melodies[:, 0] = i0
+    melodies[:, 1:] = sorties
+    return melodies
 
 
-def generer_melodie(matrice, note_depart, longueur):
+def generer_melodie(matrice, note_depart, longueur, rng=None):
     """
     Génère une mélodie à partir d'une matrice de transition de Markov d'ordre 1.
 
@@ -112,38 +323,22 @@ def generer_melodie(matrice, note_depart, longueur):
     en fonction des probabilités dans la matrice de transition.
 
     Args:
-        matrice (dict): La matrice de transition d'ordre 1
+        matrice (tuple): La matrice de transition d'ordre 1, telle que renvoyée
+                         par construire_matrice_transition
         note_depart (str): La première note de la mélodie générée
         longueur (int): Le nombre total de notes à générer
+        rng (optional): Graine ou numpy.random.Generator utilisé pour les tirages
 
     Returns:
         list: La séquence de notes générée
-    """
-    melodie = [note_depart]
-    note_actuelle = note_depart
-
-    for _ in range(longueur - 1):
-        # Si la note actuelle n'est pas dans la matrice, choisir une note aléatoire
-        if note_actuelle not in matrice:
-            note_actuelle = random.choice(list(matrice.keys()))
-            melodie.append(note_actuelle)
-            continue
 
-        # Obtenir les probabilités de transition depuis la note actuelle
-        possibilites = matrice[note_actuelle]
-
-        # Choisir la prochaine note en fonction des probabilités
-        note_suivante = random.choices(
-            list(possibilites.keys()), weights=list(possibilites.values()), k=1
-        )[0]
-
-        melodie.append(note_suivante)
-        note_actuelle = note_suivante
-
-    return melodie
+    Raises:
+        ValueError: Si la matrice ne contient aucune transition observée
+    """
+    return decoder_notes(generer_melodies(matrice, note_depart, longueur, 1, rng)[0])
 
 
-def generer_melodie_ordre2(matrice, notes_depart, longueur):
+def generer_melodie_ordre2(matrice, notes_depart, longueur, rng=None):
     """
     Génère une mélodie à partir d'une matrice de transition de Markov d'ordre 2.
 
@@ -151,47 +346,59 @@ def generer_melodie_ordre2(matrice, notes_depart, longueur):
     suivantes en fonction des probabilités associées à chaque paire de notes.
 
     Args:
-        matrice (dict): La matrice de transition d'ordre 2
+        matrice (tuple): La matrice de transition d'ordre 2, telle que renvoyée
+                         par construire_matrice_transition_ordre2 ou par
+                         construire_matrice_transition_ordre2_creuse
         notes_depart (tuple): Les deux premières notes de la mélodie (n1, n2)
         longueur (int): Le nombre total de notes à générer
+        rng (optional): Graine ou numpy.random.Generator utilisé pour les tirages
 
     Returns:
         list: La séquence de notes générée
 
     Raises:
-        ValueError: Si moins de deux notes de départ sont fournies
+        ValueError: Si moins de deux notes de départ sont fournies, ou si la
+                    matrice ne contient aucune transition observée
     """
     if len(notes_depart) < 2:
         raise ValueError(
             "Pour une chaîne d'ordre 2, il faut au moins 2 notes de départ"
         )
 
-    melodie = list(notes_depart)
-    etat_actuel = (notes_depart[0], notes_depart[1])
-
-    for _ in range(longueur - 2):
-        # Si l'état actuel n'est pas dans la matrice, choisir un nouvel état aléatoire
-        if etat_actuel not in matrice:
-            nouvel_etat = random.choice(list(matrice.keys()))
-            melodie.append(nouvel_etat[1])  # Ajouter seulement la deuxième note
-            etat_actuel = (etat_actuel[1], nouvel_etat[1])
-            continue
-
-        # Obtenir les probabilités de transition depuis l'état actuel
-        possibilites = matrice[etat_actuel]
-
-        # Choisir la prochaine note en fonction des probabilités
-        note_suivante = random.choices(
-            list(possibilites.keys()), weights=list(possibilites.values()), k=1
-        )[0]
+    _, indice_vers_note, P = matrice
+    m = len(indice_vers_note)
+    a, b = encoder_notes(notes_depart[:2]).astype(np.intp)
+    rng = np.random.default_rng(rng)
+    tirages = rng.random(max(longueur - 2, 0))
+
+    # Choisir le noyau selon le format de la matrice, une fois pour toutes
+    if isinstance(P, tuple):
+        # Matrice creuse : répartition de chaque ligne, recommencée par ligne
+        indptr, colonnes, probas = P
+        cumul = np.cumsum(probas)
+        cdfs = cumul - (cumul - probas)[np.repeat(indptr[:-1], np.diff(indptr))]
+        paires_observees = np.flatnonzero(np.diff(indptr))
+        simuler = functools.partial(simuler_ordre2_creux, indptr, colonnes)
+    else:
+        cdfs = _fonctions_repartition(P)
+        paires_observees = np.flatnonzero(cdfs[:, -1])
+        simuler = simuler_ordre2
+
+    if len(paires_observees) == 0:
+        raise ValueError("La matrice de transition ne contient aucune transition")
+
+    # Une paire jamais observée est remplacée par une paire observée au hasard,
+    # dont on ne garde que la deuxième note
+    cdf_repli = np.cumsum(
+        np.bincount(paires_observees % m, minlength=m), dtype=np.float64
+    )
 
-        melodie.append(note_suivante)
-        etat_actuel = (etat_actuel[1], note_suivante)
+    sortie = simuler(cdfs, cdf_repli, a, b, tirages)
 
-    return melodie
+    return list(notes_depart) + decoder_notes(sortie)
 
 
-def generer_durees(longueur, durees_possibles=[0.5, 1, 2]):
+def generer_durees(longueur, durees_possibles=(0.5, 1, 2), rng=None):
     """
     Génère des durées aléatoires pour une séquence de notes.
 
@@ -203,14 +410,21 @@ def generer_durees(longueur, durees_possibles=[0.5, 1, 2]):
         longueur (int): Le nombre de durées à générer
         durees_possibles (list, optional): Liste des durées possibles en temps
                                          (0.5=croche, 1=noire, 2=blanche)
+        rng (optional): Graine ou numpy.random.Generator utilisé pour les tirages
 
     Returns:
         list: Une liste de durées pour chaque note
     """
-    return [random.choice(durees_possibles) for _ in range(longueur)]
+    rng = np.random.default_rng(rng)
+
+    # Tirer toutes les durées en un seul appel
+    durees = rng.choice(np.asarray(durees_possibles, dtype=np.float64), size=longueur)
+    return durees.tolist()
 
 
-def creer_fichier_midi(notes, durees, tempo=120, nom_fichier="melodie_generee.mid"):
+def creer_fichier_midi(
+    notes, durees, tempo=120, nom_fichier="melodie_generee.mid", verbose=False
+):
     """
     Crée un fichier MIDI à partir d'une séquence de notes et de durées.
 
@@ -218,34 +432,15 @@ def creer_fichier_midi(notes, durees, tempo=120, nom_fichier="melodie_generee.mi
     un fichier MIDI jouable avec les durées spécifiées.
 
     Args:
-        notes (list): Liste des noms de notes (ex: ["C", "E", "G", ...])
+        notes (list): Liste des noms de notes (ex: ["C", "E", "G", ...]), ou
+                      la même liste codée par encoder_notes
         durees (list): Liste des durées correspondantes (ex: [1, 0.5, 2, ...])
         nom_fichier (str, optional): Nom du fichier MIDI à créer
+        verbose (bool, optional): Afficher le nom du fichier créé
 
     Returns:
         None: Le résultat est écrit dans un fichier
     """
-    # Conversion des noms de notes en valeurs MIDI
-    note_to_midi = {
-        "C": 60,
-        "C#": 61,
-        "Db": 61,
-        "D": 62,
-        "D#": 63,
-        "Eb": 63,
-        "E": 64,
-        "F": 65,
-        "F#": 66,
-        "Gb": 66,
-        "G": 67,
-        "G#": 68,
-        "Ab": 68,
-        "A": 69,
-        "A#": 70,
-        "Bb": 70,
-        "B": 71,
-    }
-
     # Créer un fichier MIDI avec 1 piste
     midi = MIDIFile(1)
 
@@ -259,17 +454,54 @@ def creer_fichier_midi(notes, durees, tempo=120, nom_fichier="melodie_generee.mi
     midi.addTrackName(track, time, "Mélodie générée par chaîne de Markov")
     midi.addTempo(track, time, tempo)
 
-    # Ajouter les notes
-    for note, duree in zip(notes, durees):
-        if note in note_to_midi:
-            midi.addNote(track, channel, note_to_midi[note], time, duree, volume)
-            time += duree
+    # Coder les notes par leur indice dans NOTES, -1 pour une note inconnue
+    nb_notes = min(len(notes), len(durees))
+    indices = encoder_notes(notes[:nb_notes], ignorer_inconnues=True)
+    durees = np.asarray(durees[:nb_notes], dtype=np.float64)
+
+    # Ignorer les notes inconnues et convertir les autres en valeurs MIDI
+    valides = indices >= 0
+    hauteurs = IDX_TO_MIDI[indices[valides]]
+    durees = durees[valides]
+
+    # Instant de début de chaque note : somme cumulée des durées précédentes,
+    # écrite directement dans le tableau des débuts (le premier reste à 0)
+    debuts = np.zeros_like(durees)
+    np.cumsum(durees[:-1], out=debuts[1:])
+
+    # Ajouter les notes : piste et canal sont liés une fois pour toutes, et
+    # tolist() convertit chaque tableau en int/float Python en un seul appel
+    ajouter_note = functools.partial(midi.addNote, track, channel)
+    for hauteur, debut, duree in zip(
+        hauteurs.tolist(), debuts.tolist(), durees.tolist()
+    ):
+        ajouter_note(hauteur, debut, duree, volume)
 
-    # Écrire le fichier MIDI
-    with open(nom_fichier, "wb") as output_file:
-        midi.writeFile(output_file)
+    # Écrire le fichier MIDI en mémoire, puis sur le disque en une seule fois
+    tampon = io.BytesIO()
+    midi.writeFile(tampon)
+    Path(nom_fichier).write_bytes(tampon.getbuffer())
 
-    print(f"Fichier MIDI créé : {nom_fichier}")
+    if verbose:
+        print(f"Fichier MIDI créé : {nom_fichier}")
+
+
+def frequences_notes(sequence):
+    """
+    Calcule la fréquence relative de chaque note de NOTES dans une séquence.
+
+    Args:
+        sequence (list): Une liste de notes musicales, ou la même liste codée
+                         par encoder_notes
+
+    Returns:
+        np.ndarray: Un tableau de len(NOTES) fréquences, dans l'ordre de NOTES
+    """
+    indices = encoder_notes(sequence)
+
+    # Compter toutes les notes en un seul appel
+    comptes = np.bincount(indices, minlength=len(NOTES))
+    return comptes / max(len(indices), 1)
 
 
 def analyser_distribution(sequence):
@@ -281,23 +513,21 @@ def analyser_distribution(sequence):
     différentes mélodies.
 
     Args:
-        sequence (list): Une liste de notes musicales
+        sequence (list): Une liste de notes musicales, ou la même liste codée
+                         par encoder_notes
 
     Returns:
-        dict: Un dictionnaire {note: fréquence_relative, ...}
+        dict: Un dictionnaire {note: fréquence_relative, ...}, les notes dans
+              l'ordre de leur première apparition dans la séquence
     """
-    distribution = {}
-
-    for note in sequence:
-        if note in distribution:
-            distribution[note] += 1
-        else:
-            distribution[note] = 1
+    indices = encoder_notes(sequence)
+    frequences = frequences_notes(indices)
 
-    total = len(sequence)
-    distribution_proba = {note: count / total for note, count in distribution.items()}
+    # Ordre de première apparition des notes présentes
+    _, premieres = np.unique(indices, return_index=True)
+    presentes = indices[np.sort(premieres)]
 
-    return distribution_proba
+    return dict(zip(decoder_notes(presentes), frequences[presentes].tolist()))
 
 
 def melodie_au_clair_de_la_lune():
@@ -532,7 +762,7 @@ def main():
     5. Compare les distributions de notes entre les différentes mélodies
     """
     # Définir une graine aléatoire pour la reproductibilité
-    random.seed(0)  # Commenter cette ligne pour des résultats différents
+    rng = np.random.default_rng(0)  # Remplacer 0 par None pour des résultats différents
 
     # Choisir une mélodie source
     melodie_source, durees_source = melodie_au_clair_de_la_lune()
@@ -548,25 +778,31 @@ def main():
 
     # Afficher la matrice de transition
     print("Matrice de transition pour la mélodie source:")
-    for note, transitions in matrice_transition.items():
-        print(f"Note {note} -> {transitions}")
+    _, notes, P = matrice_transition
+    for i, note in enumerate(notes.tolist()):
+        suivantes = np.flatnonzero(P[i])
+        if suivantes.size:
+            transitions = dict(zip(notes[suivantes].tolist(), P[i, suivantes].tolist()))
+            print(f"Note {note} -> {transitions}")
 
     # 3. Construire la matrice de transition d'ordre 2
     matrice_transition_ordre2 = construire_matrice_transition_ordre2(melodie_source)
 
     # 4. Générer une mélodie avec la chaîne de Markov d'ordre 1
     print("\nGénération d'une mélodie avec une chaîne de Markov d'ordre 1:")
-    melodie_ordre1 = generer_melodie(matrice_transition, "C", 30)
+    melodie_ordre1 = generer_melodie(matrice_transition, "C", 30, rng)
     print(" ".join(melodie_ordre1))
 
     # 5. Générer une mélodie avec la chaîne de Markov d'ordre 2
     print("\nGénération d'une mélodie avec une chaîne de Markov d'ordre 2:")
-    melodie_ordre2 = generer_melodie_ordre2(matrice_transition_ordre2, ("C", "C"), 30)
+    melodie_ordre2 = generer_melodie_ordre2(
+        matrice_transition_ordre2, ("C", "C"), 30, rng
+    )
     print(" ".join(melodie_ordre2))
 
     # 6. Générer des durées pour les notes
-    durees_ordre1 = generer_durees(len(melodie_ordre1))
-    durees_ordre2 = generer_durees(len(melodie_ordre2))
+    durees_ordre1 = generer_durees(len(melodie_ordre1), rng=rng)
+    durees_ordre2 = generer_durees(len(melodie_ordre2), rng=rng)
 
     # 7. Créer des fichiers MIDI
     # Générer le fichier MIDI du morceau original
@@ -13,13 +13,154 @@ Utilisation:
 Dépendances externes:
     - numpy
     - midiutil
+    - numba (optionnel, compile les boucles de génération)
 """
 
 # Import des bibliothèques nécessaires
-import random
+import functools
+import io
+from pathlib import Path
+from types import MappingProxyType
+
 import numpy as np
 from midiutil import MIDIFile
 
+from noyaux_markov import (
+    AVEC_NUMBA,
+    SEUIL_LOT_NUMPY,
+    simuler_lot,
+    simuler_lot_numpy,
+    simuler_ordre2,
+    simuler_ordre2_creux,
+    table_alias,
+    tables_alias,
+)
+
+# Les noyaux d'ordre n sont compilés par numba s'il est installé, comme ceux
+# de noyaux_markov
+try:
+    from numba import njit, prange
+except ImportError:
+    # Sans numba, les noyaux d'ordre n s'exécutent en Python pur
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fonction: fonction
+
+    prange = range
+
+# Conversion des noms de notes en valeurs MIDI
+NOTE_TO_MIDI = MappingProxyType(
+    {
+        "C": 60,
+        "C#": 61,
+        "Db": 61,
+        "D": 62,
+        "D#": 63,
+        "Eb": 63,
+        "E": 64,
+        "F": 65,
+        "F#": 66,
+        "Gb": 66,
+        "G": 67,
+        "G#": 68,
+        "Ab": 68,
+        "A": 69,
+        "A#": 70,
+        "Bb": 70,
+        "B": 71,
+    }
+)
+
+# Alphabet des notes connues : chaque note a un indice compact, et IDX_TO_MIDI
+# donne directement la valeur MIDI d'un indice
+NOTES = tuple(NOTE_TO_MIDI)
+NOTE_TO_IDX = {note: i for i, note in enumerate(NOTES)}
+IDX_TO_MIDI = np.array([NOTE_TO_MIDI[note] for note in NOTES], dtype=np.int8)
+_TABLE_NOTES = np.array(NOTES)
+
+
+def encoder_notes(notes, ignorer_inconnues=False):
+    """
+    Code une séquence de noms de notes par leurs indices dans NOTES.
+
+    Les notes circulent ensuite sous forme de tableau int8 dans les calculs,
+    et ne sont reconverties en noms (decoder_notes) ou en valeurs MIDI
+    (IDX_TO_MIDI) qu'en sortie. Une séquence déjà codée est renvoyée telle
+    quelle, après vérification que ses indices désignent bien des notes.
+
+    Args:
+        notes (list ou np.ndarray): Des noms de notes (ex: ["C", "D", "E", ...])
+                                    ou des indices de notes
+        ignorer_inconnues (bool, optional): Coder une note inconnue par -1 au
+                                            lieu de lever une erreur (un indice
+                                            -1 est alors aussi accepté)
+
+    Returns:
+        np.ndarray: Les indices des notes (int8)
+
+    Raises:
+        ValueError: Si une note ne fait pas partie de NOTES, ou si un indice
+                    est en dehors de NOTES
+    """
+    if isinstance(notes, np.ndarray) and notes.dtype.kind in "iu":
+        # Un indice hors de NOTES ferait un tour complet dans int8, et -1
+        # désignerait silencieusement la dernière note
+        minimum = -1 if ignorer_inconnues else 0
+        invalides = (notes < minimum) | (notes >= len(NOTES))
+        if invalides.any():
+            raise ValueError(f"Note inconnue : {notes[invalides][0].item()!r}")
+        return notes.astype(np.int8, copy=False)
+
+    if ignorer_inconnues:
+        indices = (NOTE_TO_IDX.get(note, -1) for note in notes)
+    else:
+        try:
+            indices = [NOTE_TO_IDX[note] for note in notes]
+        except KeyError as erreur:
+            raise ValueError(f"Note inconnue : {erreur.args[0]!r}") from None
+    return np.fromiter(indices, dtype=np.int8, count=len(notes))
+
+
+def decoder_notes(indices):
+    """
+    Reconvertit des indices de notes (voir encoder_notes) en noms de notes.
+
+    Args:
+        indices (np.ndarray): Des indices de notes
+
+    Returns:
+        list: Les noms des notes correspondantes
+    """
+    return _TABLE_NOTES[indices].tolist()
+
+
+def _encoder_sequence(sequence):
+    """
+    Code une séquence de notes pour la construction des matrices.
+
+    Returns:
+        tuple: Un triplet (note_vers_indice, indice_vers_note, indices) où
+               note_vers_indice est NOTE_TO_IDX, indice_vers_note le tableau
+               numpy des noms de NOTES et indices la séquence codée, d'un type
+               entier assez large pour calculer les indices d'états
+    """
+    indices = encoder_notes(sequence).astype(np.intp)
+    return NOTE_TO_IDX, _TABLE_NOTES, indices
+
+
+def _normaliser_lignes(comptes):
+    """
+    Convertit une matrice de comptes en matrice stochastique par lignes.
+
+    Les lignes sans aucune transition observée restent nulles. La division
+    se fait sur place : le tableau de comptes devient la matrice.
+    """
+    totaux = comptes.sum(axis=1, keepdims=True)
+    totaux[totaux == 0] = 1
+    return np.divide(comptes, totaux, out=comptes)
+
 
 def construire_matrice_transition(sequence):
     """
@@ -27,42 +168,27 @@ def construire_matrice_transition(sequence):
 
     La matrice de transition contient les probabilités de passer d'une note
     à une autre, calculées à partir de la fréquence de ces transitions dans
-    la séquence d'entrée.
+    la séquence d'entrée. La séquence est codée une seule fois en indices,
+    puis toutes les transitions sont comptées en une passe vectorisée.
 
     Args:
-        sequence (list): Une liste de notes musicales (ex: ["C", "D", "E", ...])
+        sequence (list): Une liste de notes musicales (ex: ["C", "D", "E", ...]),
+                         ou la même séquence codée par encoder_notes
 
     Returns:
-        dict: Un dictionnaire de dictionnaires représentant la matrice de transition.
-              Le format est {note_actuelle: {note_suivante: probabilité, ...}, ...}
+        tuple: Un triplet (note_vers_indice, indice_vers_note, P) où P est une
+               matrice numpy (m, m), avec m = len(NOTES), telle que P[i, j] est
+               la probabilité de passer de la note i à la note j. La ligne
+               d'une note sans successeur observé est nulle.
     """
-    # Dictionnaire pour stocker les transitions
-    transitions = {}
+    note_vers_indice, indice_vers_note, indices = _encoder_sequence(sequence)
+    m = len(indice_vers_note)
 
-    # Compter les transitions
-    for i in range(len(sequence) - 1):
-        note_actuelle = sequence[i]
-        note_suivante = sequence[i + 1]
+    # Compter les transitions (i -> j) en une seule passe
+    comptes = np.zeros((m, m), dtype=np.float64)
+    np.add.at(comptes, (indices[:-1], indices[1:]), 1)
 
-        # Si la note actuelle n'est pas encore dans le dictionnaire, l'initialiser
-        if note_actuelle not in transitions:
-            transitions[note_actuelle] = {}
-
-        # Incrémenter le compteur pour cette transition
-        if note_suivante in transitions[note_actuelle]:
-            transitions[note_actuelle][note_suivante] += 1
-        else:
-            transitions[note_actuelle][note_suivante] = 1
-
-    # Convertir les compteurs en probabilités
-    matrice_proba = {}
-    for note_actuelle, suivantes in transitions.items():
-        total = sum(suivantes.values())
-        matrice_proba[note_actuelle] = {
-            note_suivante: count / total for note_suivante, count in suivantes.items()
-        }
-
-    return matrice_proba
+    return note_vers_indice, indice_vers_note, _normaliser_lignes(comptes)
 
 
 def construire_matrice_transition_ordre2(sequence):
@@ -71,40 +197,139 @@ def construire_matrice_transition_ordre2(sequence):
 
     Dans une chaîne de Markov d'ordre 2, l'état est défini par les deux notes
     précédentes, ce qui permet de capturer des motifs musicaux plus complexes.
+    La paire de notes (a, b) est représentée par l'indice de ligne a * m + b.
 
     Args:
-        sequence (list): Une liste de notes musicales (ex: ["C", "D", "E", ...])
+        sequence (list): Une liste de notes musicales (ex: ["C", "D", "E", ...]),
+                         ou la même séquence codée par encoder_notes
 
     Returns:
-        dict: Un dictionnaire où les clés sont des tuples de deux notes (état actuel)
-              et les valeurs sont des dictionnaires {note_suivante: probabilité, ...}
+        tuple: Un triplet (note_vers_indice, indice_vers_note, P) où P est une
+               matrice numpy (m * m, m) telle que P[a * m + b, j] est la
+               probabilité de jouer la note j après la paire (a, b). Les lignes
+               des paires jamais observées sont nulles.
     """
-    transitions = {}
+    note_vers_indice, indice_vers_note, indices = _encoder_sequence(sequence)
+    m = len(indice_vers_note)
 
-    for i in range(len(sequence) - 2):
-        etat_actuel = (sequence[i], sequence[i + 1])  # Paire de notes
-        note_suivante = sequence[i + 2]
+    # Indice de ligne de chaque paire de notes consécutives
+    paires = indices[:-2] * m + indices[1:-1]
 
-        if etat_actuel not in transitions:
-            transitions[etat_actuel] = {}
+    comptes = np.zeros((m * m, m), dtype=np.float64)
+    np.add.at(comptes, (paires, indices[2:]), 1)
 
-        if note_suivante in transitions[etat_actuel]:
-            transitions[etat_actuel][note_suivante] += 1
-        else:
-            transitions[etat_actuel][note_suivante] = 1
+    return note_vers_indice, indice_vers_note, _normaliser_lignes(comptes)
+
+
+def construire_matrice_transition_ordre2_creuse(sequence):
+    """
+    Construit une matrice de transition d'ordre 2 au format creux (CSR).
+
+    La matrice dense d'ordre 2 a m * m lignes, dont la plupart correspondent à
+    des paires de notes jamais observées. Ce format ne stocke que les
+    transitions observées, triées par ligne :
+    les transitions de la paire (a, b) sont colonnes[debut:fin] avec les
+    probabilités probas[debut:fin], où debut, fin = indptr[r], indptr[r + 1]
+    et r = a * m + b.
+
+    Args:
+        sequence (list): Une liste de notes musicales (ex: ["C", "D", "E", ...]),
+                         ou la même séquence codée par encoder_notes
+
+    Returns:
+        tuple: Un triplet (note_vers_indice, indice_vers_note, P) où P est le
+               triplet CSR (indptr, colonnes, probas)
+    """
+    note_vers_indice, indice_vers_note, indices = _encoder_sequence(sequence)
+    m = len(indice_vers_note)
+
+    # Chaque transition (a, b) -> c est codée par l'entier (a * m + b) * m + c ;
+    # np.unique les trie par ligne puis par colonne et les compte
+    paires = indices[:-2] * m + indices[1:-1]
+    transitions, comptes = np.unique(paires * m + indices[2:], return_counts=True)
+    lignes = transitions // m
+    colonnes = (transitions % m).astype(np.int32)
+
+    indptr = np.zeros(m * m + 1, dtype=np.int64)
+    np.cumsum(np.bincount(lignes, minlength=m * m), out=indptr[1:])
+
+    totaux = np.bincount(lignes, weights=comptes, minlength=m * m)
+    probas = comptes / totaux[lignes]
+
+    return note_vers_indice, indice_vers_note, (indptr, colonnes, probas)
+
+
+def _fonctions_repartition(P):
+    """
+    Calcule une fois pour toutes la fonction de répartition de chaque ligne de P.
+
+    Le tirage d'une transition depuis l'état i se ramène alors à chercher la
+    position d'un nombre uniforme dans la ligne i (voir noyaux_markov.rechercher).
+    """
+    return np.cumsum(P, axis=1)
 
-    # Convertir en probabilités
-    matrice_proba = {}
-    for etat, suivantes in transitions.items():
-        total = sum(suivantes.values())
-        matrice_proba[etat] = {
-            note_suivante: count / total for note_suivante, count in suivantes.items()
-        }
 
-    return matrice_proba
+def generer_melodies(matrice, note_depart, longueur, nb_melodies=1, rng=None):
+    """
+    Génère plusieurs mélodies indépendantes avec une chaîne de Markov d'ordre 1.
+
+    Tous les nombres aléatoires sont tirés en un seul appel, puis les
+    nb_melodies parcours de la chaîne sont effectués ensemble à partir de la
+    même note de départ. Chaque note est tirée en temps constant grâce aux
+    tables d'alias des lignes de la matrice.
 
+    Args:
+        matrice (tuple): La matrice de transition d'ordre 1, telle que renvoyée
+                         par construire_matrice_transition
+        note_depart (str): La première note de chaque mélodie
+        longueur (int): Le nombre total de notes de chaque mélodie
+        nb_melodies (int, optional): Le nombre de mélodies à générer
+        rng (optional): Graine ou numpy.random.Generator utilisé pour les tirages
 
-def generer_melodie(matrice, note_depart, longueur):
+    Returns:
+        np.ndarray: Un tableau int8 (nb_melodies, longueur) d'indices de notes
+                    (voir decoder_notes), une mélodie par ligne
+
+    Raises:
+        ValueError: Si la matrice ne contient aucune transition observée
+    """
+    _, _, P = matrice
+    i0 = encoder_notes([note_depart])[0]
+    rng = np.random.default_rng(rng)
+
+    observes = P.sum(axis=1) > 0
+    if not observes.any():
+        raise ValueError("La matrice de transition ne contient aucune transition")
+
+    probas, alias = tables_alias(P)
+
+    # Une note sans successeur est remplacée par une note observée au hasard
+    proba_repli, alias_repli = table_alias(observes.astype(np.float64))
+
+    # Sans numba, la boucle Python par note ne reste intéressante que pour
+    # quelques mélodies ; au-delà, les chaînes avancent ensemble via NumPy
+    if AVEC_NUMBA or nb_melodies < SEUIL_LOT_NUMPY:
+        simuler = simuler_lot
+    else:
+        simuler = simuler_lot_numpy
+
+    sorties = simuler(
+        probas,
+        alias,
+        observes,
+        proba_repli,
+        alias_repli,
+        i0,
+        rng.random((nb_melodies, max(longueur - 1, 0))),
+    )
+
+    melodies = np.empty((nb_melodies, 1 + sorties.shape[1]), dtype=np.int8)
+    melodies[:, 0] = i0
+    melodies[:, 1:] = sorties
+    return melodies
+
+
+def generer_melodie(matrice, note_depart, longueur, rng=None):
     """
     Génère une mélodie à partir d'une matrice de transition de Markov d'ordre 1.
 
@@ -112,38 +337,22 @@ def generer_melodie(matrice, note_depart, longueur):
     en fonction des probabilités dans la matrice de transition.
 
     Args:
-        matrice (dict): La matrice de transition d'ordre 1
+        matrice (tuple): La matrice de transition d'ordre 1, telle que renvoyée
+                         par construire_matrice_transition
         note_depart (str): La première note de la mélodie générée
         longueur (int): Le nombre total de notes à générer
+        rng (optional): Graine ou numpy.random.Generator utilisé pour les tirages
 
     Returns:
         list: La séquence de notes générée
-    """
-    melodie = [note_depart]
-    note_actuelle = note_depart
-
-    for _ in range(longueur - 1):
-        # Si la note actuelle n'est pas dans la matrice, choisir une note aléatoire
-        if note_actuelle not in matrice:
-            note_actuelle = random.choice(list(matrice.keys()))
-            melodie.append(note_actuelle)
-            continue
-
-        # Obtenir les probabilités de transition depuis la note actuelle
-        possibilites = matrice[note_actuelle]
 
-        # Choisir la prochaine note en fonction des probabilités
-        note_suivante = random.choices(
-            list(possibilites.keys()), weights=list(possibilites.values()), k=1
-        )[0]
-
-        melodie.append(note_suivante)
-        note_actuelle = note_suivante
-
-    return melodie
+    Raises:
+        ValueError: Si la matrice ne contient aucune transition observée
+    """
+    return decoder_notes(generer_melodies(matrice, note_depart, longueur, 1, rng)[0])
 
 
-def generer_melodie_ordre2(matrice, notes_depart, longueur):
+def generer_melodie_ordre2(matrice, notes_depart, longueur, rng=None):
     """
     Génère une mélodie à partir d'une matrice de transition de Markov d'ordre 2.
 
@@ -151,47 +360,59 @@ def generer_melodie_ordre2(matrice, notes_depart, longueur):
     suivantes en fonction des probabilités associées à chaque paire de notes.
 
     Args:
-        matrice (dict): La matrice de transition d'ordre 2
+        matrice (tuple): La matrice de transition d'ordre 2, telle que renvoyée
+                         par construire_matrice_transition_ordre2 ou par
+                         construire_matrice_transition_ordre2_creuse
         notes_depart (tuple): Les deux premières notes de la mélodie (n1, n2)
         longueur (int): Le nombre total de notes à générer
+        rng (optional): Graine ou numpy.random.Generator utilisé pour les tirages
 
     Returns:
         list: La séquence de notes générée
 
     Raises:
-        ValueError: Si moins de deux notes de départ sont fournies
+        ValueError: Si moins de deux notes de départ sont fournies, ou si la
+                    matrice ne contient aucune transition observée
     """
     if len(notes_depart) < 2:
         raise ValueError(
             "Pour une chaîne d'ordre 2, il faut au moins 2 notes de départ"
         )
 
-    melodie = list(notes_depart)
-    etat_actuel = (notes_depart[0], notes_depart[1])
-
-    for _ in range(longueur - 2):
-        # Si l'état actuel n'est pas dans la matrice, choisir un nouvel état aléatoire
-        if etat_actuel not in matrice:
-            nouvel_etat = random.choice(list(matrice.keys()))
-            melodie.append(nouvel_etat[1])  # Ajouter seulement la deuxième note
-            etat_actuel = (etat_actuel[1], nouvel_etat[1])
-            continue
+    _, indice_vers_note, P = matrice
+    m = len(indice_vers_note)
+    a, b = encoder_notes(notes_depart[:2]).astype(np.intp)
+    rng = np.random.default_rng(rng)
+    tirages = rng.random(max(longueur - 2, 0))
+
+    # Choisir le noyau selon le format de la matrice, une fois pour toutes
+    if isinstance(P, tuple):
+        # Matrice creuse : répartition de chaque ligne, recommencée par ligne
+        indptr, colonnes, probas = P
+        cumul = np.cumsum(probas)
+        cdfs = cumul - (cumul - probas)[np.repeat(indptr[:-1], np.diff(indptr))]
+        paires_observees = np.flatnonzero(np.diff(indptr))
+        simuler = functools.partial(simuler_ordre2_creux, indptr, colonnes)
+    else:
+        cdfs = _fonctions_repartition(P)
+        paires_observees = np.flatnonzero(cdfs[:, -1])
+        simuler = simuler_ordre2
 
-        # Obtenir les probabilités de transition depuis l'état actuel
-        possibilites = matrice[etat_actuel]
+    if len(paires_observees) == 0:
+        raise ValueError("La matrice de transition ne contient aucune transition")
 
-        # Choisir la prochaine note en fonction des probabilités
-        note_suivante = random.choices(
-            list(possibilites.keys()), weights=list(possibilites.values()), k=1
-        )[0]
+    # Une paire jamais observée est remplacée par une paire observée au hasard,
+    # dont on ne garde que la deuxième note
+    cdf_repli = np.cumsum(
+        np.bincount(paires_observees % m, minlength=m), dtype=np.float64
+    )
 
-        melodie.append(note_suivante)
-        etat_actuel = (etat_actuel[1], note_suivante)
+    sortie = simuler(cdfs, cdf_repli, a, b, tirages)
 
-    return melodie
+    return list(notes_depart) + decoder_notes(sortie)
 
 
-def generer_durees(longueur, durees_possibles=[0.5, 1, 2]):
+def generer_durees(longueur, durees_possibles=(0.5, 1, 2), rng=None):
     """
     Génère des durées aléatoires pour une séquence de notes.
 
@@ -203,14 +424,21 @@ def generer_durees(longueur, durees_possibles=[0.5, 1, 2]):
         longueur (int): Le nombre de durées à générer
         durees_possibles (list, optional): Liste des durées possibles en temps
                                          (0.5=croche, 1=noire, 2=blanche)
+        rng (optional): Graine ou numpy.random.Generator utilisé pour les tirages
 
     Returns:
         list: Une liste de durées pour chaque note
     """
-    return [random.choice(durees_possibles) for _ in range(longueur)]
+    rng = np.random.default_rng(rng)
+
+    # Tirer toutes les durées en un seul appel
+    durees = rng.choice(np.asarray(durees_possibles, dtype=np.float64), size=longueur)
+    return durees.tolist()
 
 
-def creer_fichier_midi(notes, durees, tempo=120, nom_fichier="melodie_generee.mid"):
+def creer_fichier_midi(
+    notes, durees, tempo=120, nom_fichier="melodie_generee.mid", verbose=False
+):
     """
     Crée un fichier MIDI à partir d'une séquence de notes et de durées.
 
@@ -218,34 +446,15 @@ def creer_fichier_midi(notes, durees, tempo=120, nom_fichier="melodie_generee.mi
     un fichier MIDI jouable avec les durées spécifiées.
 
     Args:
-        notes (list): Liste des noms de notes (ex: ["C", "E", "G", ...])
+        notes (list): Liste des noms de notes (ex: ["C", "E", "G", ...]), ou
+                      la même liste codée par encoder_notes
         durees (list): Liste des durées correspondantes (ex: [1, 0.5, 2, ...])
         nom_fichier (str, optional): Nom du fichier MIDI à créer
+        verbose (bool, optional): Afficher le nom du fichier créé
 
     Returns:
         None: Le résultat est écrit dans un fichier
     """
-    # Conversion des noms de notes en valeurs MIDI
-    note_to_midi = {
-        "C": 60,
-        "C#": 61,
-        "Db": 61,
-        "D": 62,
-        "D#": 63,
-        "Eb": 63,
-        "E": 64,
-        "F": 65,
-        "F#": 66,
-        "Gb": 66,
-        "G": 67,
-        "G#": 68,
-        "Ab": 68,
-        "A": 69,
-        "A#": 70,
-        "Bb": 70,
-        "B": 71,
-    }
-
     # Créer un fichier MIDI avec 1 piste
     midi = MIDIFile(1)
 
@@ -259,17 +468,54 @@ def creer_fichier_midi(notes, durees, tempo=120, nom_fichier="melodie_generee.mi
     midi.addTrackName(track, time, "Mélodie générée par chaîne de Markov")
     midi.addTempo(track, time, tempo)
 
-    # Ajouter les notes
-    for note, duree in zip(notes, durees):
-        if note in note_to_midi:
-            midi.addNote(track, channel, note_to_midi[note], time, duree, volume)
-            time += duree
+    # Coder les notes par leur indice dans NOTES, -1 pour une note inconnue
+    nb_notes = min(len(notes), len(durees))
+    indices = encoder_notes(notes[:nb_notes], ignorer_inconnues=True)
+    durees = np.asarray(durees[:nb_notes], dtype=np.float64)
+
+    # Ignorer les notes inconnues et convertir les autres en valeurs MIDI
+    valides = indices >= 0
+    hauteurs = IDX_TO_MIDI[indices[valides]]
+    durees = durees[valides]
+
+    # Instant de début de chaque note : somme cumulée des durées précédentes,
+    # écrite directement dans le tableau des débuts (le premier reste à 0)
+    debuts = np.zeros_like(durees)
+    np.cumsum(durees[:-1], out=debuts[1:])
+
+    # Ajouter les notes : piste et canal sont liés une fois pour toutes, et
+    # tolist() convertit chaque tableau en int/float Python en un seul appel
+    ajouter_note = functools.partial(midi.addNote, track, channel)
+    for hauteur, debut, duree in zip(
+        hauteurs.tolist(), debuts.tolist(), durees.tolist()
+    ):
+        ajouter_note(hauteur, debut, duree, volume)
 
-    # Écrire le fichier MIDI
-    with open(nom_fichier, "wb") as output_file:
-        midi.writeFile(output_file)
+    # Écrire le fichier MIDI en mémoire, puis sur le disque en une seule fois
+    tampon = io.BytesIO()
+    midi.writeFile(tampon)
+    Path(nom_fichier).write_bytes(tampon.getbuffer())
 
-    print(f"Fichier MIDI créé : {nom_fichier}")
+    if verbose:
+        print(f"Fichier MIDI créé : {nom_fichier}")
+
+
+def frequences_notes(sequence):
+    """
+    Calcule la fréquence relative de chaque note de NOTES dans une séquence.
+
+    Args:
+        sequence (list): Une liste de notes musicales, ou la même liste codée
+                         par encoder_notes
+
+    Returns:
+        np.ndarray: Un tableau de len(NOTES) fréquences, dans l'ordre de NOTES
+    """
+    indices = encoder_notes(sequence)
+
+    # Compter toutes les notes en un seul appel
+    comptes = np.bincount(indices, minlength=len(NOTES))
+    return comptes / max(len(indices), 1)
 
 
 def analyser_distribution(sequence):
@@ -281,23 +527,43 @@ def analyser_distribution(sequence):
     différentes mélodies.
 
     Args:
-        sequence (list): Une liste de notes musicales
+        sequence (list): Une liste de notes musicales, ou la même liste codée
+                         par encoder_notes
 
     Returns:
-        dict: Un dictionnaire {note: fréquence_relative, ...}
+        dict: Un dictionnaire {note: fréquence_relative, ...}, les notes dans
+              l'ordre de leur première apparition dans la séquence
     """
-    distribution = {}
+    indices = encoder_notes(sequence)
+    frequences = frequences_notes(indices)
 
-    for note in sequence:
-        if note in distribution:
-            distribution[note] += 1
-        else:
-            distribution[note] = 1
+    # Ordre de première apparition des notes présentes
+    _, premieres = np.unique(indices, return_index=True)
+    presentes = indices[np.sort(premieres)]
 
-    total = len(sequence)
-    distribution_proba = {note: count / total for note, count in distribution.items()}
+    return dict(zip(decoder_notes(presentes), frequences[presentes].tolist()))
 
-    return distribution_proba
+
+# Nombre de bits occupés par une note dans la clé d'un état d'ordre n
+_BITS_NOTE = (len(NOTES) - 1).bit_length()
+
+# Jusqu'à ce nombre de bits par clé (n <= 3), la ligne de chaque état est lue
+# dans une table indexée par la clé plutôt que cherchée par dichotomie
+_BITS_TABLE_ETATS = 15
+
+
+def _cles_etats(indices, n):
+    """
+    Calcule la clé de l'état d'ordre n de chaque position suivie d'une note.
+
+    La clé de la position t code les notes indices[t : t + n], une note à la
+    fois (voir construire_matrice_transition_ordre_n).
+    """
+    nb_transitions = max(len(indices) - n, 0)
+    cles = np.zeros(nb_transitions, dtype=np.int64)
+    for t in range(n):
+        cles = (cles << _BITS_NOTE) | indices[t : t + nb_transitions]
+    return cles
 
 
 def construire_matrice_transition_ordre_n(sequence, n=1):
@@ -306,82 +572,171 @@ def construire_matrice_transition_ordre_n(sequence, n=1):
 
     Dans une chaîne de Markov d'ordre n, l'état est défini par les n notes
     précédentes, ce qui permet de capturer des motifs musicaux de longueur variable.
+    L'état (x1, ..., xn) est représenté par un entier où chaque note occupe
+    _BITS_NOTE bits, x1 en tête et xn dans les bits de poids faible. Il est
+    calculé de proche en proche (etat = etat << _BITS_NOTE | note) sans créer
+    de tuple. Seuls les états observés ont une ligne : la matrice garde sa
+    taille quand n augmente, alors que le nombre d'états possibles m**n explose.
+    Les états qui ont la même distribution de notes suivantes (de plus en plus
+    nombreux quand n augmente) partagent une même ligne.
 
     Args:
-        sequence (list): Une liste de notes musicales (ex: ["C", "D", "E", ...])
+        sequence (list): Une liste de notes musicales (ex: ["C", "D", "E", ...]),
+                         ou la même séquence codée par encoder_notes
         n (int): L'ordre de la chaîne de Markov (1, 2, 3, ...)
 
     Returns:
-        dict: Un dictionnaire où les clés sont des tuples de n notes (état actuel)
-              et les valeurs sont des dictionnaires {note_suivante: probabilité, ...}
+        tuple: Un triplet (note_vers_indice, indice_vers_note, P) où P est un
+               triplet (etats, lignes, probas) : etats contient les états
+               observés, triés, et probas[lignes[i], j] est la probabilité de
+               jouer la note j après l'état etats[i].
     """
     if n < 1:
         raise ValueError("L'ordre de la chaîne de Markov doit être au moins 1")
 
-    transitions = {}
-
-    # Si n = 1, l'état est une seule note
-    if n == 1:
-        for i in range(len(sequence) - 1):
-            etat_actuel = sequence[i]  # Une seule note
-            note_suivante = sequence[i + 1]
-
-            # Initialiser le dictionnaire pour cet état s'il n'existe pas encore
-            if etat_actuel not in transitions:
-                transitions[etat_actuel] = {}
-
-            # Incrémenter le compteur pour cette transition
-            if note_suivante in transitions[etat_actuel]:
-                transitions[etat_actuel][note_suivante] += 1
-            else:
-                transitions[etat_actuel][note_suivante] = 1
-
-    # Si n > 1, l'état est un tuple de n notes
-    else:
-        for i in range(len(sequence) - n):
-            # Créer un tuple des n notes qui constituent l'état actuel
-            etat_actuel = tuple(sequence[i : i + n])
-            note_suivante = sequence[i + n]
-
-            # Initialiser le dictionnaire pour cet état s'il n'existe pas encore
-            if etat_actuel not in transitions:
-                transitions[etat_actuel] = {}
-
-            # Incrémenter le compteur pour cette transition
-            if note_suivante in transitions[etat_actuel]:
-                transitions[etat_actuel][note_suivante] += 1
+    note_vers_indice, indice_vers_note, indices = _encoder_sequence(sequence)
+    m = len(indice_vers_note)
+    if _BITS_NOTE * n > 63:
+        raise ValueError(f"L'ordre {n} est trop grand pour coder les états")
+
+    # Compter les transitions de chaque état observé, retrouvé par son rang
+    # parmi les états triés
+    etats, rangs = np.unique(_cles_etats(indices, n), return_inverse=True)
+    comptes = np.zeros((len(etats), m), dtype=np.float64)
+    np.add.at(comptes, (rangs, indices[n:]), 1)
+
+    # Ne garder qu'une ligne par distribution distincte. Chaque ligne est vue
+    # comme un bloc d'octets : np.unique compare alors des valeurs simples, ce
+    # qui est bien plus rapide que np.unique(..., axis=0)
+    probas = _normaliser_lignes(comptes)
+    blocs = probas.view(np.dtype((np.void, probas.itemsize * m))).ravel()
+    _, distinctes, lignes = np.unique(blocs, return_index=True, return_inverse=True)
+    probas = probas[distinctes]
+    lignes = lignes.astype(np.int32)
+
+    return note_vers_indice, indice_vers_note, (etats, lignes, probas)
+
+
+@njit(
+    "int8[::1](int64[::1], int32[::1], int32[::1], float64[:, ::1],"
+    " int32[:, ::1], float64[::1], int32[::1], int64, int64, float64[::1])",
+    cache=True,
+)
+def _simuler_ordre_n(
+    etats,
+    lignes,
+    table,
+    probas,
+    alias,
+    proba_repli,
+    alias_repli,
+    masque,
+    etat,
+    tirages,
+):
+    """
+    Parcourt une chaîne d'ordre n à partir de l'état etat (compilé par numba).
+
+    Voir noyaux_markov.simuler ; la ligne de l'état courant est lue dans la
+    table directe clé -> ligne (-1 pour un état jamais observé) si elle n'est
+    pas vide, et sinon retrouvée par dichotomie parmi les états observés etats,
+    puis dans lignes. Après chaque note j, un décalage fait entrer j dans
+    l'état et le masque (les n * _BITS_NOTE bits de poids faible) en fait
+    sortir la note la plus ancienne.
+    """
+    m = probas.shape[1]
+    sortie = np.empty(len(tirages), dtype=np.int8)
+    for k in range(len(tirages)):
+        if len(table) > 0:
+            ligne = table[etat]
+        else:
+            rang = np.searchsorted(etats, etat)
+            if rang < len(etats) and etats[rang] == etat:
+                ligne = lignes[rang]
             else:
-                transitions[etat_actuel][note_suivante] = 1
-
-    # Convertir les compteurs en probabilités
-    matrice_proba = {}
-    for etat, suivantes in transitions.items():
-        total = sum(suivantes.values())
-        matrice_proba[etat] = {
-            note_suivante: count / total for note_suivante, count in suivantes.items()
-        }
+                ligne = -1
+        if ligne >= 0:
+            proba = probas[ligne]
+            ali = alias[ligne]
+        else:
+            proba = proba_repli
+            ali = alias_repli
+        x = tirages[k] * m
+        case = int(x)
+        j = case if x - case < proba[case] else int(ali[case])
+        sortie[k] = j
+        etat = ((etat << _BITS_NOTE) | j) & masque
+    return sortie
+
+
+@njit(
+    "int8[:, ::1](int64[::1], int32[::1], int32[::1], float64[:, ::1],"
+    " int32[:, ::1], float64[::1], int32[::1], int64, int64, float64[:, ::1])",
+    cache=True,
+    parallel=True,
+)
+def _simuler_ordre_n_lot(
+    etats,
+    lignes,
+    table,
+    probas,
+    alias,
+    proba_repli,
+    alias_repli,
+    masque,
+    etat,
+    tirages,
+):
+    """
+    Parcourt plusieurs chaînes d'ordre n indépendantes, une par ligne de tirages.
 
-    return matrice_proba
+    Voir noyaux_markov.simuler_lot ; toutes les chaînes partent de l'état etat.
+    """
+    sorties = np.empty(tirages.shape, dtype=np.int8)
+    for r in prange(tirages.shape[0]):
+        sorties[r] = _simuler_ordre_n(
+            etats,
+            lignes,
+            table,
+            probas,
+            alias,
+            proba_repli,
+            alias_repli,
+            masque,
+            etat,
+            tirages[r],
+        )
+    return sorties
 
 
-def generer_melodie_ordre_n(matrice, notes_depart, longueur, n=1):
+def generer_melodies_ordre_n(
+    matrice, notes_depart, longueur, n=1, nb_melodies=1, rng=None
+):
     """
-    Génère une mélodie à partir d'une matrice de transition de Markov d'ordre n.
+    Génère plusieurs mélodies indépendantes avec une chaîne de Markov d'ordre n.
 
-    Le processus commence par les n premières notes, puis choisit les notes
-    suivantes en fonction des probabilités associées à chaque état de n notes.
+    Les tables d'alias de la matrice sont construites une seule fois (une par
+    ligne distincte, partagée par les états qui ont la même distribution) et tous
+    les nombres aléatoires sont tirés en un seul appel, puis les nb_melodies
+    parcours de la chaîne sont effectués ensemble à partir des mêmes notes de
+    départ (voir generer_melodie_ordre_n).
 
     Args:
-        matrice (dict): La matrice de transition d'ordre n
+        matrice (tuple): La matrice de transition d'ordre n, telle que renvoyée
+                         par construire_matrice_transition_ordre_n
         notes_depart (list ou tuple ou str): Les n premières notes de la mélodie
         longueur (int): Le nombre total de notes à générer
         n (int): L'ordre de la chaîne de Markov
+        nb_melodies (int, optional): Le nombre de mélodies à générer
+        rng (optional): Graine ou numpy.random.Generator utilisé pour les tirages
 
     Returns:
-        list: La séquence de notes générée
+        np.ndarray: Un tableau int8 d'indices de notes (voir decoder_notes), une
+                    mélodie par ligne, commençant par les notes de départ
 
     Raises:
-        ValueError: Si le nombre de notes de départ est insuffisant
+        ValueError: Si le nombre de notes de départ est insuffisant, ou si la
+                    matrice ne contient aucune transition observée
     """
     # Convertir notes_depart en liste si c'est un tuple ou une chaîne
     if isinstance(notes_depart, str):
@@ -395,61 +750,96 @@ def generer_melodie_ordre_n(matrice, notes_depart, longueur, n=1):
             f"Pour une chaîne d'ordre {n}, il faut au moins {n} notes de départ"
         )
 
-    # Initialiser la mélodie avec les notes de départ
-    melodie = list(notes_depart)
+    _, indice_vers_note, (etats, lignes, probas) = matrice
+    m = len(indice_vers_note)
+    rng = np.random.default_rng(rng)
 
-    # Pour n=1, l'état est une seule note
-    if n == 1:
-        note_actuelle = notes_depart[0]
+    if len(etats) == 0:
+        raise ValueError("La matrice de transition ne contient aucune transition")
 
-        for _ in range(longueur - 1):
-            # Si la note actuelle n'est pas dans la matrice, choisir une note aléatoire
-            if note_actuelle not in matrice:
-                note_actuelle = random.choice(list(matrice.keys()))
-                melodie.append(note_actuelle)
-                continue
+    probas, alias = tables_alias(probas)
 
-            # Obtenir les probabilités de transition depuis la note actuelle
-            possibilites = matrice[note_actuelle]
+    # Un état jamais observé est remplacé par un état observé au hasard,
+    # dont on ne garde que la dernière note
+    proba_repli, alias_repli = table_alias(
+        np.bincount(etats & ((1 << _BITS_NOTE) - 1), minlength=m).astype(np.float64)
+    )
 
-            # Choisir la prochaine note en fonction des probabilités
-            note_suivante = random.choices(
-                list(possibilites.keys()), weights=list(possibilites.values()), k=1
-            )[0]
+    # Pour n=1, l'état est la première note ; pour n>1, les n dernières notes
+    depart = encoder_notes(notes_depart)
+    if n == 1:
+        fenetre = depart[:1]
+        nb_pas = longueur - 1
+    else:
+        fenetre = depart[-n:]
+        nb_pas = longueur - n
+
+    # Coder l'état de départ
+    etat = 0
+    for note in fenetre:
+        etat = (etat << _BITS_NOTE) | int(note)
+
+    # Pour les petits ordres, table directe clé -> ligne (vide sinon)
+    if _BITS_NOTE * n <= _BITS_TABLE_ETATS:
+        table = np.full(1 << (_BITS_NOTE * n), -1, dtype=np.int32)
+        table[etats] = lignes
+    else:
+        table = np.empty(0, dtype=np.int32)
+
+    sorties = _simuler_ordre_n_lot(
+        etats,
+        lignes,
+        table,
+        probas,
+        alias,
+        proba_repli,
+        alias_repli,
+        (1 << (_BITS_NOTE * n)) - 1,
+        etat,
+        rng.random((nb_melodies, max(nb_pas, 0))),
+    )
 
-            melodie.append(note_suivante)
-            note_actuelle = note_suivante
+    melodies = np.empty((nb_melodies, len(depart) + sorties.shape[1]), dtype=np.int8)
+    melodies[:, : len(depart)] = depart
+    melodies[:, len(depart) :] = sorties
+    return melodies
 
-    # Pour n>1, l'état est un tuple de n notes
-    else:
-        # Générer la mélodie note par note
-        for _ in range(longueur - n):
-            # L'état actuel est les n dernières notes
-            etat_actuel = tuple(melodie[-n:])
 
-            # Si cet état n'est pas dans la matrice, choisir un état aléatoire
-            if etat_actuel not in matrice:
-                nouvel_etat = random.choice(list(matrice.keys()))
-                melodie.append(
-                    nouvel_etat[-1]
-                )  # Ajouter la dernière note du nouvel état
-                continue
+def generer_melodie_ordre_n(matrice, notes_depart, longueur, n=1, rng=None):
+    """
+    Génère une mélodie à partir d'une matrice de transition de Markov d'ordre n.
 
-            # Obtenir les probabilités de transition depuis cet état
-            possibilites = matrice[etat_actuel]
+    Le processus commence par les n premières notes, puis choisit les notes
+    suivantes en fonction des probabilités associées à chaque état de n notes.
+    Comme pour generer_melodies, chaque note est tirée en temps constant grâce
+    aux tables d'alias des lignes de la matrice.
 
-            # Choisir la prochaine note en fonction des probabilités
-            note_suivante = random.choices(
-                list(possibilites.keys()), weights=list(possibilites.values()), k=1
-            )[0]
+    Args:
+        matrice (tuple): La matrice de transition d'ordre n, telle que renvoyée
+                         par construire_matrice_transition_ordre_n
+        notes_depart (list ou tuple ou str): Les n premières notes de la mélodie
+        longueur (int): Le nombre total de notes à générer
+        n (int): L'ordre de la chaîne de Markov
+        rng (optional): Graine ou numpy.random.Generator utilisé pour les tirages
 
-            melodie.append(note_suivante)
+    Returns:
+        list: La séquence de notes générée
 
-    return melodie
+    Raises:
+        ValueError: Si le nombre de notes de départ est insuffisant, ou si la
+                    matrice ne contient aucune transition observée
+    """
+    return decoder_notes(
+        generer_melodies_ordre_n(matrice, notes_depart, longueur, n, rng=rng)[0]
+    )
 
 
 def analyser_markov_multiple(
-    melodie_source, ordres_markov=[1, 2, 3], longueur_genere=30, nb_melodies=3
+    melodie_source,
+    ordres_markov=[1, 2, 3],
+    longueur_genere=30,
+    nb_melodies=3,
+    rng=None,
 ):
     """
     Analyse une mélodie source avec des chaînes de Markov de différents ordres
@@ -460,11 +850,13 @@ def analyser_markov_multiple(
         ordres_markov (list): Liste des ordres de chaînes de Markov à utiliser
         longueur_genere (int): Longueur des mélodies générées
         nb_melodies (int): Nombre de mélodies à générer pour chaque ordre
+        rng (optional): Graine ou numpy.random.Generator utilisé pour les tirages
 
     Returns:
         dict: Un dictionnaire où les clés sont les ordres et les valeurs sont
               des listes de mélodies générées
     """
+    rng = np.random.default_rng(rng)
     resultats = {}
 
     for ordre in ordres_markov:
@@ -473,34 +865,42 @@ def analyser_markov_multiple(
         # Construire la matrice de transition
         matrice = construire_matrice_transition_ordre_n(melodie_source, n=ordre)
 
-        # Nombre d'états dans la matrice
-        nb_etats = len(matrice)
+        # Nombre d'états observés dans la matrice
+        _, notes, (etats, lignes, probas) = matrice
+        nb_etats = len(etats)
         print(f"Nombre d'états uniques: {nb_etats}")
 
-        # Afficher un aperçu de la matrice (pour les 3 premiers états)
-        etats = list(matrice.keys())
+        # Afficher un aperçu de la matrice (pour les 3 premiers états rencontrés
+        # dans la mélodie source, les états de la matrice étant triés par clé)
         print("Aperçu de la matrice de transition:")
-        for i, etat in enumerate(etats[:3]):
-            if isinstance(etat, tuple):
-                etat_str = " -> ".join(etat)
-            else:
-                etat_str = etat
+        _, premieres = np.unique(
+            _cles_etats(_encoder_sequence(melodie_source)[2], ordre),
+            return_index=True,
+        )
+        apercu = np.argsort(premieres)[:3]
+        for etat, ligne in zip(etats[apercu], probas[lignes[apercu]]):
+            # Retrouver les notes de l'état à partir de son indice
+            chiffres = [
+                (etat >> (_BITS_NOTE * (ordre - 1 - t))) & ((1 << _BITS_NOTE) - 1)
+                for t in range(ordre)
+            ]
+            etat_str = " -> ".join(notes[chiffres].tolist())
             print(f"  État {etat_str}:")
-            for note, proba in list(matrice[etat].items())[:3]:
-                print(f"    -> {note}: {proba:.2f}")
-            if len(matrice[etat]) > 3:
-                print(f"    ... et {len(matrice[etat])-3} autres transitions")
-
-        # Générer plusieurs mélodies
+            suivantes = np.flatnonzero(ligne)
+            for j in suivantes[:3]:
+                print(f"    -> {notes[j]}: {ligne[j]:.2f}")
+            if len(suivantes) > 3:
+                print(f"    ... et {len(suivantes)-3} autres transitions")
+
+        # Générer toutes les mélodies ensemble, à partir des premières notes de
+        # la mélodie source : les tables de tirage ne sont construites qu'une fois
+        notes_depart = melodie_source[:ordre]
+        lot = generer_melodies_ordre_n(
+            matrice, notes_depart, longueur_genere, ordre, nb_melodies, rng=rng
+        )
         melodies = []
-        for i in range(nb_melodies):
-            # Choisir les notes de départ (les premières notes de la mélodie source)
-            notes_depart = melodie_source[:ordre]
-
-            # Générer une mélodie
-            melodie = generer_melodie_ordre_n(
-                matrice, notes_depart, longueur_genere, n=ordre
-            )
+        for i, indices in enumerate(lot):
+            melodie = decoder_notes(indices)
             melodies.append(melodie)
 
             print(
@@ -523,28 +923,25 @@ def comparer_distributions(melodie_source, melodies_generees, ordres):
         ordres (list): Liste des ordres de chaînes de Markov utilisés
     """
     # Analyser la distribution de la mélodie source
-    distribution_source = analyser_distribution(melodie_source)
+    distribution_source = frequences_notes(melodie_source)
 
     print("\n=== Comparaison des distributions de notes ===")
     print("Distribution dans la mélodie source:")
     afficher_distribution(distribution_source)
 
     for ordre in ordres:
-        # Calculer la distribution moyenne pour toutes les mélodies générées avec cet ordre
-        distribution_combinee = {}
-        nb_melodies = len(melodies_generees[ordre])
-
-        for melodie in melodies_generees[ordre]:
-            dist = analyser_distribution(melodie)
-            for note, freq in dist.items():
-                if note in distribution_combinee:
-                    distribution_combinee[note] += freq
-                else:
-                    distribution_combinee[note] = freq
-
-        # Normaliser
-        for note in distribution_combinee:
-            distribution_combinee[note] /= nb_melodies
+        # Distribution moyenne des mélodies générées avec cet ordre : les
+        # comptes de toutes les mélodies sont obtenus en un seul bincount, la
+        # note i de la mélodie r étant comptée dans la case r * len(NOTES) + i
+        melodies = melodies_generees[ordre]
+        v = len(NOTES)
+        longueurs = np.array([len(melodie) for melodie in melodies], dtype=np.intp)
+        indices = encoder_notes([note for melodie in melodies for note in melodie])
+        cases = np.repeat(np.arange(len(melodies)) * v, longueurs) + indices
+        comptes = np.bincount(cases, minlength=len(melodies) * v).reshape(-1, v)
+        frequences = comptes / np.maximum(longueurs, 1)[:, None]
+        # Sans mélodie, la distribution reste nulle
+        distribution_combinee = frequences.sum(axis=0) / max(len(melodies), 1)
 
         print(f"\nDistribution moyenne pour l'ordre {ordre}:")
         afficher_distribution(distribution_combinee)
@@ -555,31 +952,37 @@ def comparer_distributions(melodie_source, melodies_generees, ordres):
 
 
 def afficher_distribution(distribution):
-    """Affiche une distribution de notes de façon lisible."""
-    notes_triees = sorted(distribution.keys())
-    for note in notes_triees:
-        freq = distribution[note]
+    """
+    Affiche une distribution de notes de façon lisible.
+
+    La distribution est un tableau de fréquences dans l'ordre de NOTES (voir
+    frequences_notes) ; seules les notes présentes sont affichées, triées
+    par nom.
+    """
+    presentes = np.flatnonzero(distribution)
+    for i in sorted(presentes, key=NOTES.__getitem__):
+        freq = distribution[i]
         barre = "#" * int(freq * 50)  # Visualisation simple
-        print(f"{note}: {freq:.2f} {barre}")
+        print(f"{NOTES[i]}: {freq:.2f} {barre}")
 
 
 def calculer_divergence(dist1, dist2):
-    """Calcule une mesure simple de divergence entre deux distributions."""
-    # Créer un ensemble de toutes les notes présentes dans les deux distributions
-    toutes_notes = set(dist1.keys()).union(set(dist2.keys()))
-
-    # Calculer la somme des différences absolues
-    divergence = 0
-    for note in toutes_notes:
-        val1 = dist1.get(note, 0)
-        val2 = dist2.get(note, 0)
-        divergence += abs(val1 - val2)
+    """
+    Calcule une mesure simple de divergence entre deux distributions.
 
-    return divergence
+    Les deux distributions sont des tableaux de fréquences alignés sur NOTES :
+    la divergence est la somme des différences absolues.
+    """
+    return float(np.abs(dist1 - dist2).sum())
 
 
 def generer_et_sauvegarder_midi(
-    melodies_generees, ordres, durees_source, nom_base="melodie", tempo=120
+    melodies_generees,
+    ordres,
+    durees_source,
+    nom_base="melodie",
+    tempo=120,
+    rng=None,
 ):
     """
     Génère des fichiers MIDI pour chaque mélodie générée et les sauvegarde.
@@ -590,17 +993,25 @@ def generer_et_sauvegarder_midi(
         durees_source (list): Liste des durées de la mélodie source (pour référence)
         nom_base (str): Préfixe pour les noms de fichiers
         tempo (int): Tempo en BPM
+        rng (optional): Graine ou numpy.random.Generator utilisé pour les tirages
     """
+    rng = np.random.default_rng(rng)
+    nb_fichiers = 0
+
     for ordre in ordres:
         for i, melodie in enumerate(melodies_generees[ordre]):
             # Générer des durées pour cette mélodie
-            durees = generer_durees(len(melodie))
+            durees = generer_durees(len(melodie), rng=rng)
 
             # Créer le nom du fichier
             nom_fichier = f"{nom_base}_ordre{ordre}_ex{i+1}.mid"
 
             # Créer le fichier MIDI
             creer_fichier_midi(melodie, durees, tempo, nom_fichier)
+            nb_fichiers += 1
+
+    # Un seul message pour l'ensemble des fichiers créés
+    print(f"{nb_fichiers} fichiers MIDI créés : {nom_base}_ordre*_ex*.mid")
 
 
 def demo_markov_ordre_n():
@@ -609,7 +1020,7 @@ def demo_markov_ordre_n():
     appliquées à la génération musicale.
     """
     # Définir une graine aléatoire pour la reproductibilité
-    random.seed(0)  # Commenter cette ligne pour des résultats différents
+    rng = np.random.default_rng(0)  # Remplacer 0 par None pour des résultats différents
 
     # Choisir entre plusieurs mélodies sources disponibles
     print("Choisissez une mélodie source :")
@@ -643,6 +1054,7 @@ def demo_markov_ordre_n():
         ordres_markov=ordres_markov,
         longueur_genere=longueur_genere,
         nb_melodies=nb_melodies,
+        rng=rng,
     )
 
     # Comparer les distributions de notes
@@ -650,7 +1062,7 @@ def demo_markov_ordre_n():
 
     # Générer et sauvegarder les fichiers MIDI des mélodies générées
     generer_et_sauvegarder_midi(
-        melodies_generees, ordres_markov, durees_source, nom_base, tempo
+        melodies_generees, ordres_markov, durees_source, nom_base, tempo, rng
     )
 
     print("\nTous les fichiers MIDI ont été générés avec succès.")
@@ -888,7 +1300,7 @@ def demo_markov_ordre_1_et_2():
     5. Compare les distributions de notes entre les différentes mélodies
     """
     # Définir une graine aléatoire pour la reproductibilité
-    random.seed(0)  # Commenter cette ligne pour des résultats différents
+    rng = np.random.default_rng(0)  # Remplacer 0 par None pour des résultats différents
 
     # Choisir une mélodie source
     melodie_source, durees_source = melodie_au_clair_de_la_lune()
@@ -904,25 +1316,31 @@ def demo_markov_ordre_1_et_2():
 
     # Afficher la matrice de transition
     print("Matrice de transition pour la mélodie source:")
-    for note, transitions in matrice_transition.items():
-        print(f"Note {note} -> {transitions}")
+    _, notes, P = matrice_transition
+    for i, note in enumerate(notes.tolist()):
+        suivantes = np.flatnonzero(P[i])
+        if suivantes.size:
+            transitions = dict(zip(notes[suivantes].tolist(), P[i, suivantes].tolist()))
+            print(f"Note {note} -> {transitions}")
 
     # 3. Construire la matrice de transition d'ordre 2
     matrice_transition_ordre2 = construire_matrice_transition_ordre2(melodie_source)
 
     # 4. Générer une mélodie avec la chaîne de Markov d'ordre 1
     print("\nGénération d'une mélodie avec une chaîne de Markov d'ordre 1:")
-    melodie_ordre1 = generer_melodie(matrice_transition, "C", 30)
+    melodie_ordre1 = generer_melodie(matrice_transition, "C", 30, rng)
     print(" ".join(melodie_ordre1))
 
     # 5. Générer une mélodie avec la chaîne de Markov d'ordre 2
     print("\nGénération d'une mélodie avec une chaîne de Markov d'ordre 2:")
-    melodie_ordre2 = generer_melodie_ordre2(matrice_transition_ordre2, ("C", "C"), 30)
+    melodie_ordre2 = generer_melodie_ordre2(
+        matrice_transition_ordre2, ("C", "C"), 30, rng
+    )
     print(" ".join(melodie_ordre2))
 
     # 6. Générer des durées pour les notes
-    durees_ordre1 = generer_durees(len(melodie_ordre1))
-    durees_ordre2 = generer_durees(len(melodie_ordre2))
+    durees_ordre1 = generer_durees(len(melodie_ordre1), rng=rng)
+    durees_ordre2 = generer_durees(len(melodie_ordre2), rng=rng)
 
     # 7. Créer des fichiers MIDI
     # Générer le fichier MIDI du morceau original
@@ -0,0 +1,276 @@
+"""
+Noyaux de génération partagés par main_ordre_1_et_2.py et main_ordre_n.py
+
+Ce module regroupe les boucles de tirage des chaînes de Markov (tables
+d'alias, parcours d'ordre 1 et 2). Elles sont compilées par numba s'il est
+installé, et s'exécutent en Python pur sinon. Les deux scripts importent ce
+module : quand ils sont utilisés ensemble, les noyaux ne sont compilés (ou
+chargés depuis le cache) qu'une seule fois.
+
+Interface (voir __all__):
+    - AVEC_NUMBA : vrai si les noyaux sont compilés par numba
+    - table_alias, tables_alias : tables d'alias d'une distribution, ou de
+      chaque ligne d'une matrice
+    - rechercher : position d'une valeur dans une ligne de répartition
+    - simuler, simuler_lot : parcours d'une ou plusieurs chaînes d'ordre 1
+    - simuler_lot_numpy, SEUIL_LOT_NUMPY : variante NumPy de simuler_lot,
+      et nombre de mélodies à partir duquel elle est préférable sans numba
+    - simuler_ordre2, simuler_ordre2_creux : parcours d'une chaîne d'ordre 2,
+      matrice dense ou au format CSR
+
+Les décorateurs njit et prange utilisés ici ne font pas partie de
+l'interface.
+
+Dépendances externes:
+    - numpy
+    - numba (optionnel)
+"""
+
+import bisect
+
+import numpy as np
+
+__all__ = [
+    "AVEC_NUMBA",
+    "SEUIL_LOT_NUMPY",
+    "rechercher",
+    "simuler",
+    "simuler_lot",
+    "simuler_lot_numpy",
+    "simuler_ordre2",
+    "simuler_ordre2_creux",
+    "table_alias",
+    "tables_alias",
+]
+
+# Les noyaux de génération sont compilés par numba s'il est installé. Leurs
+# signatures sont explicites : numba les compile dès l'import et garde le code
+# machine en cache (dans __pycache__), que relisent les imports suivants au
+# lieu de recompiler.
+try:
+    from numba import njit, prange
+
+    AVEC_NUMBA = True
+except ImportError:
+    AVEC_NUMBA = False
+
+    # Sans numba, les noyaux de génération s'exécutent en Python pur
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fonction: fonction
+
+    prange = range
+
+    def rechercher(cdf, x):
+        """Position de x dans une ligne de répartition (recherche dichotomique)."""
+        # bisect évite le coût d'appel de np.searchsorted pour une seule valeur
+        return bisect.bisect_right(cdf, x)
+
+else:
+
+    @njit("intp(float64[::1], float64)", cache=True)
+    def rechercher(cdf, x):
+        """
+        Position de x dans une ligne de répartition.
+
+        Une ligne courte est parcourue linéairement jusqu'à la première valeur
+        supérieure à x, une ligne longue est cherchée par dichotomie.
+        """
+        if len(cdf) <= 32:
+            # Ligne courte (alphabet de 17 notes) : le parcours linéaire avec
+            # sortie anticipée est plus rapide que la dichotomie, et aussi que
+            # le comptage sans branchement des valeurs <= x (mesuré plus lent)
+            for k in range(len(cdf)):
+                if cdf[k] > x:
+                    return k
+            return len(cdf)
+        return np.searchsorted(cdf, x, side="right")
+
+
+@njit("Tuple((float64[::1], int32[::1]))(float64[::1])", cache=True)
+def table_alias(p):
+    """
+    Construit la table d'alias (méthode de Vose) d'une distribution p.
+
+    Chaque case k de la table contient une probabilité proba[k] et un alias
+    alias[k] : tirer une case k uniformément, puis garder k avec la probabilité
+    proba[k] (sinon prendre alias[k]) revient à tirer selon p, en temps constant.
+    """
+    m = len(p)
+    proba = np.ones(m)
+    alias = np.arange(m).astype(np.int32)
+    echelle = p * m / p.sum()
+
+    # Piles des cases sous-remplies (< 1) et sur-remplies (>= 1)
+    petits = np.empty(m, dtype=np.int64)
+    grands = np.empty(m, dtype=np.int64)
+    nb_petits = 0
+    nb_grands = 0
+    for k in range(m):
+        if echelle[k] < 1:
+            petits[nb_petits] = k
+            nb_petits += 1
+        else:
+            grands[nb_grands] = k
+            nb_grands += 1
+
+    # Compléter chaque case sous-remplie avec une case sur-remplie ; les cases
+    # restantes gardent proba = 1 (aux erreurs d'arrondi près)
+    while nb_petits > 0 and nb_grands > 0:
+        nb_petits -= 1
+        petit = petits[nb_petits]
+        grand = grands[nb_grands - 1]
+        proba[petit] = echelle[petit]
+        alias[petit] = grand
+        echelle[grand] += echelle[petit] - 1
+        if echelle[grand] < 1:
+            nb_grands -= 1
+            petits[nb_petits] = grand
+            nb_petits += 1
+
+    return proba, alias
+
+
+@njit("Tuple((float64[:, ::1], int32[:, ::1]))(float64[:, ::1])", cache=True)
+def tables_alias(P):
+    """Construit la table d'alias de chaque ligne non nulle de P."""
+    probas = np.ones(P.shape)
+    alias = np.zeros(P.shape, dtype=np.int32)
+    for i in range(P.shape[0]):
+        if P[i].sum() > 0:
+            probas[i], alias[i] = table_alias(P[i])
+    return probas, alias
+
+
+@njit(
+    "int8[::1](float64[:, ::1], int32[:, ::1], boolean[::1], float64[::1],"
+    " int32[::1], int64, float64[::1])",
+    cache=True,
+)
+def simuler(probas, alias, observes, proba_repli, alias_repli, i0, tirages):
+    """
+    Parcourt une chaîne d'ordre 1 à partir de l'état i0 (compilé par numba).
+
+    Les nombres uniformes sont tirés à l'avance par l'appelant (un par pas),
+    le noyau n'a donc pas à gérer l'état du générateur aléatoire. Chaque pas
+    utilise les tables d'alias de l'état courant : la partie entière de u * m
+    choisit la case, sa partie fractionnaire décide entre la case et son alias.
+    Un état sans successeur utilise la table de repli.
+    """
+    m = probas.shape[1]
+    sortie = np.empty(len(tirages), dtype=np.int8)
+    i = i0
+    for k in range(len(tirages)):
+        if observes[i]:
+            proba = probas[i]
+            ali = alias[i]
+        else:
+            proba = proba_repli
+            ali = alias_repli
+        x = tirages[k] * m
+        case = int(x)
+        i = case if x - case < proba[case] else ali[case]
+        sortie[k] = i
+    return sortie
+
+
+@njit(
+    "int8[:, ::1](float64[:, ::1], int32[:, ::1], boolean[::1], float64[::1],"
+    " int32[::1], int64, float64[:, ::1])",
+    cache=True,
+    parallel=True,
+)
+def simuler_lot(probas, alias, observes, proba_repli, alias_repli, i0, tirages):
+    """
+    Parcourt plusieurs chaînes d'ordre 1 indépendantes, une par ligne de tirages.
+
+    Les chaînes partagent les mêmes tables d'alias et sont réparties sur
+    plusieurs cœurs par numba.
+    """
+    sorties = np.empty(tirages.shape, dtype=np.int8)
+    for r in prange(tirages.shape[0]):
+        sorties[r] = simuler(
+            probas, alias, observes, proba_repli, alias_repli, i0, tirages[r]
+        )
+    return sorties
+
+
+# Nombre de mélodies à partir duquel, sans numba, simuler_lot_numpy est utilisé
+SEUIL_LOT_NUMPY = 8
+
+
+def simuler_lot_numpy(probas, alias, observes, proba_repli, alias_repli, i0, tirages):
+    """
+    Variante de simuler_lot sans numba : toutes les chaînes avancent ensemble.
+
+    Chaque pas traite toutes les chaînes en quelques opérations NumPy : les
+    chaînes qui sont dans le même état lisent la même ligne des tables d'alias.
+    Les calculs sont ceux de simuler, les mélodies obtenues sont identiques.
+    """
+    m = probas.shape[1]
+    # Les états sans successeur reçoivent directement les tables de repli
+    probas = np.where(observes[:, None], probas, proba_repli)
+    alias = np.where(observes[:, None], alias, alias_repli)
+
+    # Un pas par ligne, pour lire les tirages de toutes les chaînes d'un bloc
+    tirages = np.ascontiguousarray(tirages.T)
+    sorties = np.empty(tirages.shape, dtype=np.int8)
+    etats = np.full(tirages.shape[1], i0, dtype=np.intp)
+    for k in range(tirages.shape[0]):
+        x = tirages[k] * m
+        cases = x.astype(np.intp)
+        etats = np.where(x - cases < probas[etats, cases], cases, alias[etats, cases])
+        sorties[k] = etats
+    return np.ascontiguousarray(sorties.T)
+
+
+@njit(
+    "int8[::1](float64[:, ::1], float64[::1], int64, int64, float64[::1])",
+    cache=True,
+)
+def simuler_ordre2(cdfs, cdf_repli, a, b, tirages):
+    """
+    Parcourt une chaîne d'ordre 2 à partir de la paire (a, b) (compilé par numba).
+
+    Voir simuler ; la ligne de la paire (a, b) est a * m + b.
+    """
+    m = cdfs.shape[1]
+    sortie = np.empty(len(tirages), dtype=np.int8)
+    for k in range(len(tirages)):
+        if cdfs[a * m + b, -1] > 0:
+            cdf = cdfs[a * m + b]
+        else:
+            cdf = cdf_repli
+        j = rechercher(cdf, tirages[k] * cdf[-1])
+        sortie[k] = j
+        a, b = b, j
+    return sortie
+
+
+@njit(
+    "int8[::1](int64[::1], int32[::1], float64[::1], float64[::1], int64, int64,"
+    " float64[::1])",
+    cache=True,
+)
+def simuler_ordre2_creux(indptr, colonnes, cdfs, cdf_repli, a, b, tirages):
+    """
+    Variante de simuler_ordre2 pour une matrice au format CSR.
+
+    cdfs contient la fonction de répartition de chaque ligne, recommencée
+    à chaque ligne : seule la courte ligne de la paire courante est parcourue.
+    """
+    m = len(cdf_repli)
+    sortie = np.empty(len(tirages), dtype=np.int8)
+    for k in range(len(tirages)):
+        debut = indptr[a * m + b]
+        fin = indptr[a * m + b + 1]
+        if fin > debut:
+            cdf = cdfs[debut:fin]
+            position = rechercher(cdf, tirages[k] * cdf[-1])
+            j = colonnes[debut + position]
+        else:
+            j = rechercher(cdf_repli, tirages[k] * cdf_repli[-1])
+        sortie[k] = j
+        a, b = b, j
+    return sortie